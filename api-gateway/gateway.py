@@ -1,9 +1,12 @@
 import os
+import time
+import asyncio
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader
 from jose import jwt, JWTError
+from cachetools import TTLCache
 import httpx
 from dotenv import load_dotenv
 
@@ -16,67 +19,119 @@ ALGORITHM = "HS256"
 app = FastAPI(title="Genius Machado Gateway")
 os.makedirs("frontend/static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
-templates = Jinja2Templates(directory="frontend/templates")
+# Compiled once and never re-stat'ed; restart the service to pick up template edits
+jinja_env = Environment(loader=FileSystemLoader("frontend/templates"), autoescape=True, auto_reload=False, cache_size=400, trim_blocks=True, lstrip_blocks=True)
+templates = {name: jinja_env.get_template(name) for name in ("index.html", "login.html", "register.html", "dashboard.html")}
+
+def render(name, request: Request, **context):
+    return HTMLResponse(content=templates[name].render(request=request, **context))
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+@app.on_event("startup")
+async def startup():
+    # Shared pooled clients: keep-alive connections to the backend services
+    app.state.auth_client = httpx.AsyncClient(base_url=AUTH_URL, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    app.state.strategy_client = httpx.AsyncClient(base_url=STRATEGY_URL, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    # Pages whose output doesn't depend on the visitor; index only checks whether someone is logged in
+    app.state.static_html = {
+        "login": templates["login.html"].render(request=None).encode(),
+        "register": templates["register.html"].render(request=None).encode(),
+        "index_anon": templates["index.html"].render(request=None, user=None).encode(),
+        "index_user": templates["index.html"].render(request=None, user=True).encode(),
+    }
+
+def static_page(request: Request, key):
+    return Response(content=request.app.state.static_html[key], media_type="text/html")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await app.state.auth_client.aclose()
+    await app.state.strategy_client.aclose()
+
+# Raw cookie -> decoded payload (None for invalid tokens), so refreshes skip the HMAC + JSON decode
+token_cache = TTLCache(maxsize=5000, ttl=30)
+JWT_ALGORITHMS = [ALGORITHM]
+TOKEN_REFRESH_WINDOW = 15 * 60 # seconds before exp at which the session token is re-issued
 
 def get_current_user_data(request: Request):
     token = request.cookies.get("access_token")
     if not token: return None
+    cached = token_cache.get(token, token_cache)
+    if cached is not token_cache:
+        # The cache can outlive exp by up to its TTL, so re-check it here
+        if cached and cached.get("exp", time.time()) < time.time(): return None
+        return cached
+    raw = token
     try:
         if token.startswith("Bearer "): token = token.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        return payload 
-    except JWTError: return None
+        payload = jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS)
+    except JWTError: payload = None
+    token_cache[raw] = payload
+    return payload
+
+@app.middleware("http")
+async def refresh_session(request: Request, call_next):
+    response = await call_next(request)
+    payload = get_current_user_data(request)
+    # Leave responses that already set or clear the cookie (login, logout) alone
+    if not payload or any(h.startswith("access_token=") for h in response.headers.getlist("set-cookie")): return response
+    if payload.get("exp", float("inf")) - time.time() > TOKEN_REFRESH_WINDOW: return response
+    try:
+        resp = await request.app.state.auth_client.post("/refresh", data={"token": request.cookies["access_token"]})
+        if resp.status_code == 200: response.set_cookie(key="access_token", value=f"Bearer {resp.json()['access_token']}", httponly=True)
+    except httpx.HTTPError: pass
+    return response
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    user = get_current_user_data(request)
-    return templates.TemplateResponse("index.html", {"request": request, "user": user})
+    return static_page(request, "index_user" if get_current_user_data(request) else "index_anon")
 
 @app.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request): return templates.TemplateResponse("login.html", {"request": request})
+async def login_page(request: Request): return static_page(request, "login")
 
 @app.get("/register", response_class=HTMLResponse)
-async def register_page(request: Request): return templates.TemplateResponse("register.html", {"request": request})
+async def register_page(request: Request): return static_page(request, "register")
+
+def backend_json(resp, fallback):
+    # resp is a gather() result: either a Response or the exception the request raised
+    if isinstance(resp, Exception): return fallback
+    try: return resp.json()
+    except ValueError: return fallback
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
     
-    analysis_data = {}
-    account_data = {}
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.get(f"{STRATEGY_URL}/analysis")
-            analysis_data = resp.json()
-            acc_resp = await client.get(f"{STRATEGY_URL}/account-status")
-            account_data = acc_resp.json()
-    except Exception as e:
-        # Fallback data to prevent crash
-        analysis_data = {"symbol": "OFFLINE", "price": 0, "reasoning": "System Offline"}
-        account_data = {"daily_pl": 0, "balance": 0, "win_rate": 0, "trades_count": 0, "history": [], "status": "OFFLINE", "daily_limit": 1000}
-
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request, 
-        "user": user_data.get("sub"), 
-        "analysis": analysis_data,
-        "account": account_data
-    })
+    client = request.app.state.strategy_client
+    # Both calls are independent, so fetch them concurrently
+    resp, acc_resp = await asyncio.gather(client.get("/analysis"), client.get("/account-status"), return_exceptions=True)
+    # Fallback data per response to prevent crash
+    analysis_data = backend_json(resp, {"symbol": "OFFLINE", "price": 0, "reasoning": "System Offline"})
+    account_data = backend_json(acc_resp, {"daily_pl": 0, "balance": 0, "win_rate": 0, "trades_count": 0, "history": [], "status": "OFFLINE", "daily_limit": 1000})
+
+    return render("dashboard.html", request,
+        user=user_data.get("sub"), 
+        analysis=analysis_data,
+        account=account_data
+    )
 
 @app.post("/api/execute")
 async def execute_trade(request: Request, symbol: str = Form(...), action: str = Form(...)):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
     
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(f"{STRATEGY_URL}/execute", json={
-                "symbol": symbol, 
-                "action": action, 
-                "user": user_data.get("sub"),
-                "reasoning": "Manual Override Execution"
-            })
-        except: pass
+    client = request.app.state.strategy_client
+    try:
+        await client.post("/execute", json={
+            "symbol": symbol, 
+            "action": action, 
+            "user": user_data.get("sub"),
+            "reasoning": "Manual Override Execution"
+        })
+    except: pass
         
     return RedirectResponse(url="/dashboard?executed=true", status_code=303)
 
@@ -84,31 +139,30 @@ async def execute_trade(request: Request, symbol: str = Form(...), action: str =
 async def reset_account(request: Request):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
-    async with httpx.AsyncClient() as client:
-        await client.post(f"{STRATEGY_URL}/reset")
+    await request.app.state.strategy_client.post("/reset")
     return RedirectResponse(url="/dashboard", status_code=303)
 
 @app.post("/auth/register")
 async def register_action(request: Request, email: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{AUTH_URL}/register", data={"email": email, "password": password})
-            if resp.status_code == 200: return RedirectResponse(url="/login?registered=true", status_code=303)
-            return templates.TemplateResponse("register.html", {"request": request, "error": "Email exists"})
-        except: return templates.TemplateResponse("register.html", {"request": request, "error": "Service Down"})
+    client = request.app.state.auth_client
+    try:
+        resp = await client.post("/register", data={"email": email, "password": password})
+        if resp.status_code == 200: return RedirectResponse(url="/login?registered=true", status_code=303)
+        return render("register.html", request, error="Email exists")
+    except: return render("register.html", request, error="Service Down")
 
 @app.post("/auth/login")
 async def login_action(request: Request, email: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{AUTH_URL}/token", data={"email": email, "password": password})
-            if resp.status_code == 200:
-                token = resp.json().get("access_token")
-                response = RedirectResponse(url="/dashboard", status_code=303)
-                response.set_cookie(key="access_token", value=f"Bearer {token}", httponly=True)
-                return response
-            return templates.TemplateResponse("login.html", {"request": request, "error": "Invalid credentials"})
-        except: return templates.TemplateResponse("login.html", {"request": request, "error": "Service Down"})
+    client = request.app.state.auth_client
+    try:
+        resp = await client.post("/token", data={"email": email, "password": password})
+        if resp.status_code == 200:
+            token = resp.json().get("access_token")
+            response = RedirectResponse(url="/dashboard", status_code=303)
+            response.set_cookie(key="access_token", value=f"Bearer {token}", httponly=True)
+            return response
+        return render("login.html", request, error="Invalid credentials")
+    except: return render("login.html", request, error="Service Down")
 
 @app.get("/logout")
 async def logout():
@@ -1,11 +1,15 @@
 import os
+import asyncio
+import datetime
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI, HTTPException, Form
 from fastapi.responses import JSONResponse
 from pydantic import EmailStr
-from jose import jwt
-from passlib.hash import bcrypt
+from jose import jwt, JWTError
+from cachetools import TTLCache
+from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy import MetaData, Table, Column, Integer, String, Boolean, DateTime, select, insert
+from sqlalchemy import MetaData, Table, Column, Integer, String, Boolean, DateTime, select, insert, update
 from sqlalchemy.sql import func
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -13,30 +17,80 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET = os.getenv("JWT_SECRET", "supersecret")
 ALGORITHM = "HS256"
+# Short-lived; the gateway re-issues via /refresh while the user stays active
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "60"))
+HASH_MAX_PENDING = 500
+HASH_QUEUE_TIMEOUT = 1.0
+# New hashes use argon2id; existing bcrypt hashes still verify and are upgraded on the next login
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 AsyncSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 metadata = MetaData()
-users = Table("users", metadata, Column("id", Integer, primary_key=True), Column("email", String(255), unique=True), Column("password", String(255)), Column("is_active", Boolean, default=True), Column("tier", String(50), default="free"), Column("created_at", DateTime, server_default=func.now()))
+# index=True only takes effect when create_all builds the table; in the compose setup db/init.sql creates it first
+# and its UNIQUE constraint on email already gives MySQL the lookup index
+users = Table("users", metadata, Column("id", Integer, primary_key=True), Column("email", String(255), unique=True, index=True), Column("password", String(255)), Column("is_active", Boolean, default=True), Column("tier", String(50), default="free"), Column("created_at", DateTime, server_default=func.now()))
+# email -> (hashed_password, tier); only the DB read is cached, the hash check still runs every login
+user_cache = TTLCache(maxsize=10_000, ttl=60)
 app = FastAPI()
 @app.on_event("startup")
 async def startup():
+    # Password hashing is CPU-bound; run it in worker processes so logins don't block the event loop
+    app.state.hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    app.state.hash_slots = asyncio.Semaphore(HASH_MAX_PENDING)
     async with engine.begin() as conn: await conn.run_sync(metadata.create_all)
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.hash_pool.shutdown()
+# Module-level so the process pool can pickle them by reference
+def hash_password(password): return pwd_context.hash(password)
+def verify_password(password, hashed): return pwd_context.verify_and_update(password, hashed)
+async def run_hasher(fn, *args):
+    try: await asyncio.wait_for(app.state.hash_slots.acquire(), timeout=HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError: raise HTTPException(status_code=503, detail="Busy", headers={"Retry-After": "1"})
+    try: return await asyncio.get_running_loop().run_in_executor(app.state.hash_pool, fn, *args)
+    finally: app.state.hash_slots.release()
+def issue_token(email, tier):
+    exp = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    token = jwt.encode({"sub": email, "tier": tier, "exp": exp}, JWT_SECRET, algorithm=ALGORITHM)
+    return {"access_token": token, "token_type": "bearer"}
 @app.post("/register")
 async def register(email: EmailStr = Form(...), password: str = Form(None)):
     async with AsyncSessionLocal() as session:
-        res = await session.execute(select(users).where(users.c.email==email))
+        res = await session.execute(select(users.c.id).where(users.c.email==email))
         if res.scalar_one_or_none(): raise HTTPException(status_code=400, detail="Exists")
-        hashed = bcrypt.hash(password) if password else None
+        hashed = await run_hasher(hash_password, password) if password else None
         await session.execute(insert(users).values(email=email, password=hashed, tier="free"))
         await session.commit()
+        user_cache.pop(email, None)
         return JSONResponse({"ok":True})
 @app.post("/token")
-async def token(email: EmailStr = Form(...), password: str = Form(None)):
-    async with AsyncSessionLocal() as session:
-        res = await session.execute(select(users).where(users.c.email==email))
-        row = res.fetchone()
-        if not row or not password: raise HTTPException(status_code=400, detail="Invalid")
-        db_pass = row._mapping.get("password")
-        if not bcrypt.verify(password, db_pass): raise HTTPException(status_code=400, detail="Invalid")
-        token = jwt.encode({"sub": email, "tier": row._mapping.get("tier")}, JWT_SECRET, algorithm=ALGORITHM)
-        return {"access_token": token, "token_type": "bearer"}
+async def token(email: str = Form(...), password: str = Form(None)):
+    # No EmailStr here: an unknown address fails the lookup anyway, only junk is screened out
+    email = email.strip()
+    if len(email) > 320 or "@" not in email: raise HTTPException(status_code=400, detail="Invalid")
+    # Match what EmailStr stored at /register (domain lowercased) for the cache key, lookup and sub
+    local, _, domain = email.rpartition("@")
+    email = f"{local}@{domain.lower()}"
+    cached = user_cache.get(email)
+    if cached is None:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(users.c.password, users.c.tier).where(users.c.email==email))
+            row = res.fetchone()
+        if row: cached = user_cache[email] = (row._mapping.get("password"), row._mapping.get("tier"))
+    if not cached or not password: raise HTTPException(status_code=400, detail="Invalid")
+    db_pass, tier = cached
+    valid, new_hash = await run_hasher(verify_password, password, db_pass)
+    if not valid: raise HTTPException(status_code=400, detail="Invalid")
+    if new_hash:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(users).where(users.c.email==email).values(password=new_hash))
+            await session.commit()
+        user_cache[email] = (new_hash, tier)
+    return issue_token(email, tier)
+@app.post("/refresh")
+async def refresh(token: str = Form(...)):
+    # Re-issue from a still-valid token: HMAC check only, no password hash or DB lookup
+    if token.startswith("Bearer "): token = token.split(" ")[1]
+    try: payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+    except JWTError: raise HTTPException(status_code=401, detail="Invalid")
+    return issue_token(payload.get("sub"), payload.get("tier"))
@@ -85,6 +85,7 @@ services:
     environment:
       DATABASE_URL: mysql+aiomysql://genius:geniuspass@db:3306/genius
       TRADOVATE_ENV: "paper" 
+      TRADE_JOURNAL: /app/trade_journal.jsonl
     depends_on:
       db:
         condition: service_healthy
@@ -123,7 +124,8 @@ dependencies = [
     "python-multipart>=0.0.7",
     "python-jose[cryptography]>=3.3.0",
     "cryptography>=42.0.0",
-    "email-validator>=2.1.0"
+    "email-validator>=2.1.0",
+    "cachetools>=5.3.0"
 ]
 TOML
 
@@ -135,16 +137,19 @@ COPY pyproject.toml .
 RUN uv pip install --system --no-cache -r pyproject.toml
 COPY . .
 EXPOSE 8000
-CMD ["uv", "run", "uvicorn", "gateway:app", "--host", "0.0.0.0", "--port", "8000", "--reload"]
+CMD ["uv", "run", "uvicorn", "gateway:app", "--host", "0.0.0.0", "--port", "8000", "--loop", "uvloop", "--http", "httptools", "--reload"]
 DF
 
 cat > "$REPO/api-gateway/gateway.py" <<'PY'
 import os
+import time
+import asyncio
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader
 from jose import jwt, JWTError
+from cachetools import TTLCache
 import httpx
 from dotenv import load_dotenv
 
@@ -157,67 +162,119 @@ ALGORITHM = "HS256"
 app = FastAPI(title="Genius Machado Gateway")
 os.makedirs("frontend/static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
-templates = Jinja2Templates(directory="frontend/templates")
+# Compiled once and never re-stat'ed; restart the service to pick up template edits
+jinja_env = Environment(loader=FileSystemLoader("frontend/templates"), autoescape=True, auto_reload=False, cache_size=400, trim_blocks=True, lstrip_blocks=True)
+templates = {name: jinja_env.get_template(name) for name in ("index.html", "login.html", "register.html", "dashboard.html")}
+
+def render(name, request: Request, **context):
+    return HTMLResponse(content=templates[name].render(request=request, **context))
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+@app.on_event("startup")
+async def startup():
+    # Shared pooled clients: keep-alive connections to the backend services
+    app.state.auth_client = httpx.AsyncClient(base_url=AUTH_URL, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    app.state.strategy_client = httpx.AsyncClient(base_url=STRATEGY_URL, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    # Pages whose output doesn't depend on the visitor; index only checks whether someone is logged in
+    app.state.static_html = {
+        "login": templates["login.html"].render(request=None).encode(),
+        "register": templates["register.html"].render(request=None).encode(),
+        "index_anon": templates["index.html"].render(request=None, user=None).encode(),
+        "index_user": templates["index.html"].render(request=None, user=True).encode(),
+    }
+
+def static_page(request: Request, key):
+    return Response(content=request.app.state.static_html[key], media_type="text/html")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await app.state.auth_client.aclose()
+    await app.state.strategy_client.aclose()
+
+# Raw cookie -> decoded payload (None for invalid tokens), so refreshes skip the HMAC + JSON decode
+token_cache = TTLCache(maxsize=5000, ttl=30)
+JWT_ALGORITHMS = [ALGORITHM]
+TOKEN_REFRESH_WINDOW = 15 * 60 # seconds before exp at which the session token is re-issued
 
 def get_current_user_data(request: Request):
     token = request.cookies.get("access_token")
     if not token: return None
+    cached = token_cache.get(token, token_cache)
+    if cached is not token_cache:
+        # The cache can outlive exp by up to its TTL, so re-check it here
+        if cached and cached.get("exp", time.time()) < time.time(): return None
+        return cached
+    raw = token
     try:
         if token.startswith("Bearer "): token = token.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        return payload 
-    except JWTError: return None
+        payload = jwt.decode(token, JWT_SECRET, algorithms=JWT_ALGORITHMS)
+    except JWTError: payload = None
+    token_cache[raw] = payload
+    return payload
+
+@app.middleware("http")
+async def refresh_session(request: Request, call_next):
+    response = await call_next(request)
+    payload = get_current_user_data(request)
+    # Leave responses that already set or clear the cookie (login, logout) alone
+    if not payload or any(h.startswith("access_token=") for h in response.headers.getlist("set-cookie")): return response
+    if payload.get("exp", float("inf")) - time.time() > TOKEN_REFRESH_WINDOW: return response
+    try:
+        resp = await request.app.state.auth_client.post("/refresh", data={"token": request.cookies["access_token"]})
+        if resp.status_code == 200: response.set_cookie(key="access_token", value=f"Bearer {resp.json()['access_token']}", httponly=True)
+    except httpx.HTTPError: pass
+    return response
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    user = get_current_user_data(request)
-    return templates.TemplateResponse("index.html", {"request": request, "user": user})
+    return static_page(request, "index_user" if get_current_user_data(request) else "index_anon")
 
 @app.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request): return templates.TemplateResponse("login.html", {"request": request})
+async def login_page(request: Request): return static_page(request, "login")
 
 @app.get("/register", response_class=HTMLResponse)
-async def register_page(request: Request): return templates.TemplateResponse("register.html", {"request": request})
+async def register_page(request: Request): return static_page(request, "register")
+
+def backend_json(resp, fallback):
+    # resp is a gather() result: either a Response or the exception the request raised
+    if isinstance(resp, Exception): return fallback
+    try: return resp.json()
+    except ValueError: return fallback
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
     
-    analysis_data = {}
-    account_data = {}
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.get(f"{STRATEGY_URL}/analysis")
-            analysis_data = resp.json()
-            acc_resp = await client.get(f"{STRATEGY_URL}/account-status")
-            account_data = acc_resp.json()
-    except Exception as e:
-        # Fallback data to prevent crash
-        analysis_data = {"symbol": "OFFLINE", "price": 0, "reasoning": "System Offline"}
-        account_data = {"daily_pl": 0, "balance": 0, "win_rate": 0, "trades_count": 0, "history": [], "status": "OFFLINE", "daily_limit": 1000}
-
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request, 
-        "user": user_data.get("sub"), 
-        "analysis": analysis_data,
-        "account": account_data
-    })
+    client = request.app.state.strategy_client
+    # Both calls are independent, so fetch them concurrently
+    resp, acc_resp = await asyncio.gather(client.get("/analysis"), client.get("/account-status"), return_exceptions=True)
+    # Fallback data per response to prevent crash
+    analysis_data = backend_json(resp, {"symbol": "OFFLINE", "price": 0, "reasoning": "System Offline"})
+    account_data = backend_json(acc_resp, {"daily_pl": 0, "balance": 0, "win_rate": 0, "trades_count": 0, "history": [], "status": "OFFLINE", "daily_limit": 1000})
+
+    return render("dashboard.html", request,
+        user=user_data.get("sub"), 
+        analysis=analysis_data,
+        account=account_data
+    )
 
 @app.post("/api/execute")
 async def execute_trade(request: Request, symbol: str = Form(...), action: str = Form(...)):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
     
-    async with httpx.AsyncClient() as client:
-        try:
-            await client.post(f"{STRATEGY_URL}/execute", json={
-                "symbol": symbol, 
-                "action": action, 
-                "user": user_data.get("sub"),
-                "reasoning": "Manual Override Execution"
-            })
-        except: pass
+    client = request.app.state.strategy_client
+    try:
+        await client.post("/execute", json={
+            "symbol": symbol, 
+            "action": action, 
+            "user": user_data.get("sub"),
+            "reasoning": "Manual Override Execution"
+        })
+    except: pass
         
     return RedirectResponse(url="/dashboard?executed=true", status_code=303)
 
@@ -225,31 +282,30 @@ async def execute_trade(request: Request, symbol: str = Form(...), action: str =
 async def reset_account(request: Request):
     user_data = get_current_user_data(request)
     if not user_data: return RedirectResponse(url="/login", status_code=302)
-    async with httpx.AsyncClient() as client:
-        await client.post(f"{STRATEGY_URL}/reset")
+    await request.app.state.strategy_client.post("/reset")
     return RedirectResponse(url="/dashboard", status_code=303)
 
 @app.post("/auth/register")
 async def register_action(request: Request, email: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{AUTH_URL}/register", data={"email": email, "password": password})
-            if resp.status_code == 200: return RedirectResponse(url="/login?registered=true", status_code=303)
-            return templates.TemplateResponse("register.html", {"request": request, "error": "Email exists"})
-        except: return templates.TemplateResponse("register.html", {"request": request, "error": "Service Down"})
+    client = request.app.state.auth_client
+    try:
+        resp = await client.post("/register", data={"email": email, "password": password})
+        if resp.status_code == 200: return RedirectResponse(url="/login?registered=true", status_code=303)
+        return render("register.html", request, error="Email exists")
+    except: return render("register.html", request, error="Service Down")
 
 @app.post("/auth/login")
 async def login_action(request: Request, email: str = Form(...), password: str = Form(...)):
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(f"{AUTH_URL}/token", data={"email": email, "password": password})
-            if resp.status_code == 200:
-                token = resp.json().get("access_token")
-                response = RedirectResponse(url="/dashboard", status_code=303)
-                response.set_cookie(key="access_token", value=f"Bearer {token}", httponly=True)
-                return response
-            return templates.TemplateResponse("login.html", {"request": request, "error": "Invalid credentials"})
-        except: return templates.TemplateResponse("login.html", {"request": request, "error": "Service Down"})
+    client = request.app.state.auth_client
+    try:
+        resp = await client.post("/token", data={"email": email, "password": password})
+        if resp.status_code == 200:
+            token = resp.json().get("access_token")
+            response = RedirectResponse(url="/dashboard", status_code=303)
+            response.set_cookie(key="access_token", value=f"Bearer {token}", httponly=True)
+            return response
+        return render("login.html", request, error="Invalid credentials")
+    except: return render("login.html", request, error="Service Down")
 
 @app.get("/logout")
 async def logout():
@@ -267,7 +323,7 @@ cat > "$REPO/auth-service/pyproject.toml" <<'TOML'
 name = "auth-service"
 version = "0.23.0"
 requires-python = ">=3.11"
-dependencies = ["fastapi", "uvicorn[standard]", "sqlalchemy>=2.0.0", "aiomysql", "python-jose[cryptography]", "passlib[bcrypt]", "python-dotenv", "pydantic", "cryptography", "python-multipart", "email-validator", "bcrypt==4.0.1"]
+dependencies = ["fastapi", "uvicorn[standard]", "sqlalchemy>=2.0.0", "aiomysql", "python-jose[cryptography]", "passlib[bcrypt,argon2]", "python-dotenv", "pydantic", "cryptography", "python-multipart", "email-validator", "bcrypt==4.0.1", "cachetools"]
 TOML
 cat > "$REPO/auth-service/Dockerfile" <<'DF'
 FROM python:3.11-slim
@@ -277,17 +333,21 @@ COPY pyproject.toml .
 RUN uv pip install --system --no-cache -r pyproject.toml
 COPY . .
 EXPOSE 8001
-CMD ["uv", "run", "uvicorn", "auth:app", "--host", "0.0.0.0", "--port", "8001", "--reload"]
+CMD ["uv", "run", "uvicorn", "auth:app", "--host", "0.0.0.0", "--port", "8001", "--loop", "uvloop", "--http", "httptools", "--reload"]
 DF
 cat > "$REPO/auth-service/auth.py" <<'PY'
 import os
+import asyncio
+import datetime
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI, HTTPException, Form
 from fastapi.responses import JSONResponse
 from pydantic import EmailStr
-from jose import jwt
-from passlib.hash import bcrypt
+from jose import jwt, JWTError
+from cachetools import TTLCache
+from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy import MetaData, Table, Column, Integer, String, Boolean, DateTime, select, insert
+from sqlalchemy import MetaData, Table, Column, Integer, String, Boolean, DateTime, select, insert, update
 from sqlalchemy.sql import func
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -295,33 +355,83 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET = os.getenv("JWT_SECRET", "supersecret")
 ALGORITHM = "HS256"
+# Short-lived; the gateway re-issues via /refresh while the user stays active
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "60"))
+HASH_MAX_PENDING = 500
+HASH_QUEUE_TIMEOUT = 1.0
+# New hashes use argon2id; existing bcrypt hashes still verify and are upgraded on the next login
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 AsyncSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 metadata = MetaData()
-users = Table("users", metadata, Column("id", Integer, primary_key=True), Column("email", String(255), unique=True), Column("password", String(255)), Column("is_active", Boolean, default=True), Column("tier", String(50), default="free"), Column("created_at", DateTime, server_default=func.now()))
+# index=True only takes effect when create_all builds the table; in the compose setup db/init.sql creates it first
+# and its UNIQUE constraint on email already gives MySQL the lookup index
+users = Table("users", metadata, Column("id", Integer, primary_key=True), Column("email", String(255), unique=True, index=True), Column("password", String(255)), Column("is_active", Boolean, default=True), Column("tier", String(50), default="free"), Column("created_at", DateTime, server_default=func.now()))
+# email -> (hashed_password, tier); only the DB read is cached, the hash check still runs every login
+user_cache = TTLCache(maxsize=10_000, ttl=60)
 app = FastAPI()
 @app.on_event("startup")
 async def startup():
+    # Password hashing is CPU-bound; run it in worker processes so logins don't block the event loop
+    app.state.hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    app.state.hash_slots = asyncio.Semaphore(HASH_MAX_PENDING)
     async with engine.begin() as conn: await conn.run_sync(metadata.create_all)
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.hash_pool.shutdown()
+# Module-level so the process pool can pickle them by reference
+def hash_password(password): return pwd_context.hash(password)
+def verify_password(password, hashed): return pwd_context.verify_and_update(password, hashed)
+async def run_hasher(fn, *args):
+    try: await asyncio.wait_for(app.state.hash_slots.acquire(), timeout=HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError: raise HTTPException(status_code=503, detail="Busy", headers={"Retry-After": "1"})
+    try: return await asyncio.get_running_loop().run_in_executor(app.state.hash_pool, fn, *args)
+    finally: app.state.hash_slots.release()
+def issue_token(email, tier):
+    exp = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    token = jwt.encode({"sub": email, "tier": tier, "exp": exp}, JWT_SECRET, algorithm=ALGORITHM)
+    return {"access_token": token, "token_type": "bearer"}
 @app.post("/register")
 async def register(email: EmailStr = Form(...), password: str = Form(None)):
     async with AsyncSessionLocal() as session:
-        res = await session.execute(select(users).where(users.c.email==email))
+        res = await session.execute(select(users.c.id).where(users.c.email==email))
         if res.scalar_one_or_none(): raise HTTPException(status_code=400, detail="Exists")
-        hashed = bcrypt.hash(password) if password else None
+        hashed = await run_hasher(hash_password, password) if password else None
         await session.execute(insert(users).values(email=email, password=hashed, tier="free"))
         await session.commit()
+        user_cache.pop(email, None)
         return JSONResponse({"ok":True})
 @app.post("/token")
-async def token(email: EmailStr = Form(...), password: str = Form(None)):
-    async with AsyncSessionLocal() as session:
-        res = await session.execute(select(users).where(users.c.email==email))
-        row = res.fetchone()
-        if not row or not password: raise HTTPException(status_code=400, detail="Invalid")
-        db_pass = row._mapping.get("password")
-        if not bcrypt.verify(password, db_pass): raise HTTPException(status_code=400, detail="Invalid")
-        token = jwt.encode({"sub": email, "tier": row._mapping.get("tier")}, JWT_SECRET, algorithm=ALGORITHM)
-        return {"access_token": token, "token_type": "bearer"}
+async def token(email: str = Form(...), password: str = Form(None)):
+    # No EmailStr here: an unknown address fails the lookup anyway, only junk is screened out
+    email = email.strip()
+    if len(email) > 320 or "@" not in email: raise HTTPException(status_code=400, detail="Invalid")
+    # Match what EmailStr stored at /register (domain lowercased) for the cache key, lookup and sub
+    local, _, domain = email.rpartition("@")
+    email = f"{local}@{domain.lower()}"
+    cached = user_cache.get(email)
+    if cached is None:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(users.c.password, users.c.tier).where(users.c.email==email))
+            row = res.fetchone()
+        if row: cached = user_cache[email] = (row._mapping.get("password"), row._mapping.get("tier"))
+    if not cached or not password: raise HTTPException(status_code=400, detail="Invalid")
+    db_pass, tier = cached
+    valid, new_hash = await run_hasher(verify_password, password, db_pass)
+    if not valid: raise HTTPException(status_code=400, detail="Invalid")
+    if new_hash:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(users).where(users.c.email==email).values(password=new_hash))
+            await session.commit()
+        user_cache[email] = (new_hash, tier)
+    return issue_token(email, tier)
+@app.post("/refresh")
+async def refresh(token: str = Form(...)):
+    # Re-issue from a still-valid token: HMAC check only, no password hash or DB lookup
+    if token.startswith("Bearer "): token = token.split(" ")[1]
+    try: payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+    except JWTError: raise HTTPException(status_code=401, detail="Invalid")
+    return issue_token(payload.get("sub"), payload.get("tier"))
 PY
 
 # -------------------------
@@ -348,32 +458,55 @@ CMD ["uv", "run", "uvicorn", "engine:app", "--host", "0.0.0.0", "--port", "8002"
 DF
 
 cat > "$REPO/strategy-engine/paper_exchange.py" <<'PY'
-import random
+import os
+import json
+import logging
+import numpy as np
+from collections import deque
 from datetime import datetime
 
+RNG_BATCH = 1024
+log = logging.getLogger(__name__)
+
 class PaperExchange:
-    def __init__(self):
+    def __init__(self, journal_path=None):
         self.balance = 100000.0
         self.pnl = 0.0
-        self.history = [] # In-memory history, but we will persist this to DB
+        self.history = deque(maxlen=10) # Last 10 trades for the dashboard; full audit goes to the journal
+        self.journal_path = journal_path or os.getenv("TRADE_JOURNAL") # Append-only JSONL of every trade, disabled when unset
+        self._wins = 0
+        self._total = 0
+        self._rng = np.random.default_rng()
+        self._refill_rng()
+
+    def _refill_rng(self):
+        # Pre-draw simulation randomness in batches; stored as lists so per-trade reads are plain Python scalars
+        self._slip_buf = self._rng.choice([0, 0.25, 0.5], RNG_BATCH).tolist()
+        self._outcome_buf = (self._rng.random(RNG_BATCH) < 2 / 3).tolist() # True = WIN, same 2:1 odds as before
+        self._rr_buf = self._rng.uniform(1.5, 3.0, RNG_BATCH).tolist()
+        self._rng_idx = 0
 
     def reset(self):
         self.balance = 100000.0
         self.pnl = 0.0
-        self.history = []
+        self.history.clear()
+        self._wins = 0
+        self._total = 0
         return True
 
     def execute_order(self, symbol, action, quantity, price, stop, reasoning):
-        slippage = random.choice([0, 0.25, 0.5])
+        if self._rng_idx >= RNG_BATCH: self._refill_rng()
+        i = self._rng_idx
+        self._rng_idx += 1
+        slippage = self._slip_buf[i]
         fill_price = price + slippage if action == "BUY" else price - slippage
         commission = 2.0 * quantity
         
         # Simulate Outcome
-        outcome = random.choice(["WIN", "LOSS", "WIN"]) 
         profit = 0
         
-        if outcome == "WIN":
-            rr = random.uniform(1.5, 3.0)
+        if self._outcome_buf[i]:
+            rr = self._rr_buf[i]
             risk_amt = abs(fill_price - stop) * quantity * 20 # Roughly NQ calc
             profit = risk_amt * rr
             status = "WIN"
@@ -396,18 +529,24 @@ class PaperExchange:
         }
         
         self.history.append(trade_record)
+        self._total += 1
+        self._wins += status == "WIN"
+        # Journal last and never fatal: account state and risk accounting are already updated.
+        # Note this is a blocking file append on the /execute event loop; one short line per (rare) order.
+        if self.journal_path:
+            try:
+                with open(self.journal_path, "a") as f: f.write(json.dumps(trade_record) + "\n")
+            except OSError as e: log.warning("Trade journal write to %s failed: %s", self.journal_path, e)
         return trade_record
 
     def get_stats(self):
-        wins = len([t for t in self.history if t['result'] == 'WIN'])
-        total = len(self.history)
-        win_rate = round((wins / total * 100), 1) if total > 0 else 0
+        win_rate = round((self._wins / self._total * 100), 1) if self._total > 0 else 0
         return {
             "balance": round(self.balance, 2),
             "pnl": round(self.pnl, 2),
-            "trades_count": total,
+            "trades_count": self._total,
             "win_rate": win_rate,
-            "history": self.history[-10:] # Last 10 trades
+            "history": list(self.history)
         }
 PY
 
@@ -422,14 +561,14 @@ class RiskManager:
         self.risk_per_trade_pct = 0.005
         self.trades_today = 0
 
-    def can_trade(self):
-        state = self.exchange.get_stats()
+    def can_trade(self, stats=None):
+        state = stats if stats is not None else self.exchange.get_stats()
         if state['pnl'] <= -self.max_daily_loss: return False, "Daily Loss Limit Hit"
         if self.trades_today >= self.max_trades_daily: return False, "Max Trades Reached"
         return True, "OK"
 
-    def calculate_position_size(self, entry_price, stop_price, instrument="NQ"):
-        state = self.exchange.get_stats()
+    def calculate_position_size(self, entry_price, stop_price, instrument="NQ", stats=None):
+        state = stats if stats is not None else self.exchange.get_stats()
         risk_amount = state['balance'] * self.risk_per_trade_pct
         tick_val_mini = 20 if instrument == "NQ" else 50
         tick_val_micro = 2 if instrument == "NQ" else 5
@@ -442,8 +581,8 @@ class RiskManager:
         else:
             return {"type": "MICRO", "symbol": f"M{instrument}", "contracts": max(1, int(risk_amount/(point_diff*tick_val_micro)))}
     
-    def execute_paper_trade(self, symbol, action, price, stop, reasoning):
-        sizing = self.calculate_position_size(price, stop, "NQ")
+    def execute_paper_trade(self, symbol, action, price, stop, reasoning, stats=None):
+        sizing = self.calculate_position_size(price, stop, "NQ", stats)
         trade = self.exchange.execute_order(sizing['symbol'], action, sizing['contracts'], price, stop, reasoning)
         self.trades_today += 1
         return trade, sizing
@@ -457,7 +596,7 @@ class RiskManager:
             "daily_limit": self.max_daily_loss,
             "trades_today": self.trades_today,
             "max_trades": self.max_trades_daily,
-            "status": "TRADING ACTIVE" if self.can_trade()[0] else "TRADING HALTED",
+            "status": "TRADING ACTIVE" if self.can_trade(stats)[0] else "TRADING HALTED",
             "win_rate": stats['win_rate'],
             "trades_count": stats['trades_count'],
             "history": stats['history']
@@ -469,59 +608,95 @@ class RiskManager:
 PY
 
 cat > "$REPO/strategy-engine/engine.py" <<'PY'
+import asyncio
+import time
 from fastapi import FastAPI
 from pydantic import BaseModel
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import datetime
-import pytz
+from zoneinfo import ZoneInfo
 from risk_manager import RiskManager
 
 app = FastAPI(title="Genius V23 Journal Engine")
 risk = RiskManager()
 SYMBOL = "NQ=F"
+EST = ZoneInfo("America/New_York")
+ANALYSIS_TTL = 20 # seconds; analysis only moves on 5m bars
+_analysis_cache = {"ts": 0, "value": None}
+_analysis_lock = asyncio.Lock()
+_candle_cache = {} # {(symbol, period, interval, minute): df}
 
 # --- DATA ---
 def get_candles(ticker, period, interval, est):
+    # Intraday bars don't change sub-minute, so reuse a fetch within the same minute
+    minute = int(time.time() // 60)
+    key = (ticker.ticker, period, interval, minute)
+    df = _candle_cache.get(key)
+    if df is not None: return df
     try:
         df = ticker.history(period=period, interval=interval)
         if df.empty:
             fallback = yf.Ticker("QQQ")
             df = fallback.history(period=period, interval=interval)
         if df.empty: return pd.DataFrame()
-        if df.index.tz is None: df.index = df.index.tz_localize("UTC")
-        df.index = df.index.tz_convert(est)
-        return df
+        if df.index.tz is None: df.index = df.index.tz_localize("UTC").tz_convert(est)
+        else: df.index = df.index.tz_convert(est)
     except: return pd.DataFrame()
+    for k in list(_candle_cache):
+        if k[3] != minute: _candle_cache.pop(k, None)
+    _candle_cache[key] = df
+    return df
 
 # --- STRATEGY MODULES (V19 + V22) ---
 def calculate_m7_sessions(df, est):
     if df.empty: return {"RDR": None}
-    today = datetime.datetime.now(est).date()
+    today = str(datetime.datetime.now(est).date())
+    session = df.loc[today:today] # partial-string slice on the sorted index, no full-frame mask
     def get_range(sh, sm, eh, em):
-        start = pd.Timestamp(f"{today} {sh}:{sm}:00").tz_localize(est)
-        end = pd.Timestamp(f"{today} {eh}:{em}:00").tz_localize(est)
-        chunk = df[(df.index >= start) & (df.index <= end)]
+        chunk = session.between_time(f"{sh}:{sm}", f"{eh}:{em}")
         if chunk.empty: return None
-        dr_h = round(chunk['High'].max(), 2)
-        dr_l = round(chunk['Low'].min(), 2)
+        dr_h = round(float(chunk['High'].values.max()), 2)
+        dr_l = round(float(chunk['Low'].values.min()), 2)
         return {"h": dr_h, "l": dr_l, "mid": round((dr_h+dr_l)/2, 2)}
     return { "RDR": get_range("09", "30", "10", "30") }
 
 def check_silver_bullet(est):
-    now = datetime.datetime.now(est).time()
-    if datetime.time(10, 0) <= now <= datetime.time(11, 0): return "AM SILVER BULLET"
-    if datetime.time(14, 0) <= now <= datetime.time(15, 0): return "PM SILVER BULLET"
+    now = datetime.datetime.now(est)
+    minute = now.hour * 60 + now.minute
+    if 600 <= minute <= 660: return "AM SILVER BULLET"
+    if 840 <= minute <= 900: return "PM SILVER BULLET"
     return "OFF HOURS"
 
+# (is_bull, is_bear) -> (bias, reason)
+M7_BIAS = {
+    (False, False): ("NEUTRAL", None),
+    (True, False): ("BULLISH (KM7)", "Price > RDR High"),
+    (False, True): ("BEARISH (KM7)", "Price < RDR Low"),
+}
+
 # --- ENDPOINTS ---
+def cached_analysis():
+    if _analysis_cache["value"] is not None and time.monotonic() - _analysis_cache["ts"] < ANALYSIS_TTL: return _analysis_cache["value"]
+    return None
+
 @app.get("/analysis")
 async def perform_analysis():
-    est = pytz.timezone('America/New_York')
+    result = cached_analysis()
+    if result is not None: return result
+    async with _analysis_lock:
+        # Another request may have refreshed the cache while we waited
+        result = cached_analysis()
+        if result is None:
+            result = await run_analysis()
+            _analysis_cache.update(ts=time.monotonic(), value=result)
+        return result
+
+async def run_analysis():
     t = yf.Ticker(SYMBOL)
     
-    df_5m = get_candles(t, "5d", "5m", est)
+    df_5m = await asyncio.to_thread(get_candles, t, "5d", "5m", EST)
     if df_5m.empty: 
         return {
             "symbol": SYMBOL, "price": 0, 
@@ -531,22 +706,20 @@ async def perform_analysis():
             "time_logic": {"silver_bullet": "N/A"}
         }
     
-    price = round(df_5m['Close'].iloc[-1], 2)
+    price = round(float(df_5m['Close'].values[-1]), 2)
     
     # Analysis
-    sessions = calculate_m7_sessions(df_5m, est)
-    sb_status = check_silver_bullet(est)
+    sessions = calculate_m7_sessions(df_5m, EST)
+    sb_status = check_silver_bullet(EST)
     
-    m7_bias = "NEUTRAL"
-    if sessions['RDR']:
-        if price > sessions['RDR']['h']: m7_bias = "BULLISH (KM7)"
-        elif price < sessions['RDR']['l']: m7_bias = "BEARISH (KM7)"
+    rdr = sessions['RDR']
+    is_bull = bool(rdr and price > rdr['h'])
+    is_bear = bool(rdr and not is_bull and price < rdr['l'])
+    m7_bias, bias_reason = M7_BIAS[(is_bull, is_bear)]
     
     # Reasoning
-    reasons = []
-    if "BULL" in m7_bias: reasons.append(f"Price > RDR High")
-    if "BEAR" in m7_bias: reasons.append(f"Price < RDR Low")
-    if "BULLET" in sb_status: reasons.append(f"{sb_status} Active")
+    reasons = [bias_reason] if bias_reason else []
+    if sb_status != "OFF HOURS": reasons.append(f"{sb_status} Active")
     
     return {
         "symbol": SYMBOL,
@@ -573,14 +746,20 @@ async def execute_trade(req: TradeReq):
     if not allowed: return {"status": "REJECTED", "reason": reason}
     
     t = yf.Ticker(SYMBOL)
-    df = get_candles(t, "1d", "1m", pytz.timezone('America/New_York'))
+    df = await asyncio.to_thread(get_candles, t, "1d", "1m", EST)
     if df.empty: return {"status": "ERROR", "reason": "Data Offline"}
     
-    price = df['Close'].iloc[-1]
+    price = float(df['Close'].values[-1])
     stop = price - 20 if req.action == "BUY" else price + 20
     
+    # Re-check after the fetch: other trades may have filled while we awaited. No await from here to the order,
+    # so this stats snapshot is still current when the trade is sized.
+    stats = risk.exchange.get_stats()
+    allowed, reason = risk.can_trade(stats)
+    if not allowed: return {"status": "REJECTED", "reason": reason}
+    
     # Execute Paper Trade with Reasoning
-    trade, sizing = risk.execute_paper_trade(SYMBOL, req.action, price, stop, req.reasoning)
+    trade, sizing = risk.execute_paper_trade(SYMBOL, req.action, price, stop, req.reasoning, stats)
     
     return {
         "status": "FILLED (PAPER)",
@@ -1,56 +1,92 @@
+import asyncio
+import time
 from fastapi import FastAPI
 from pydantic import BaseModel
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import datetime
-import pytz
+from zoneinfo import ZoneInfo
 from risk_manager import RiskManager
 
 app = FastAPI(title="Genius V23 Journal Engine")
 risk = RiskManager()
 SYMBOL = "NQ=F"
+EST = ZoneInfo("America/New_York")
+ANALYSIS_TTL = 20 # seconds; analysis only moves on 5m bars
+_analysis_cache = {"ts": 0, "value": None}
+_analysis_lock = asyncio.Lock()
+_candle_cache = {} # {(symbol, period, interval, minute): df}
 
 # --- DATA ---
 def get_candles(ticker, period, interval, est):
+    # Intraday bars don't change sub-minute, so reuse a fetch within the same minute
+    minute = int(time.time() // 60)
+    key = (ticker.ticker, period, interval, minute)
+    df = _candle_cache.get(key)
+    if df is not None: return df
     try:
         df = ticker.history(period=period, interval=interval)
         if df.empty:
             fallback = yf.Ticker("QQQ")
             df = fallback.history(period=period, interval=interval)
         if df.empty: return pd.DataFrame()
-        if df.index.tz is None: df.index = df.index.tz_localize("UTC")
-        df.index = df.index.tz_convert(est)
-        return df
+        if df.index.tz is None: df.index = df.index.tz_localize("UTC").tz_convert(est)
+        else: df.index = df.index.tz_convert(est)
     except: return pd.DataFrame()
+    for k in list(_candle_cache):
+        if k[3] != minute: _candle_cache.pop(k, None)
+    _candle_cache[key] = df
+    return df
 
 # --- STRATEGY MODULES (V19 + V22) ---
 def calculate_m7_sessions(df, est):
     if df.empty: return {"RDR": None}
-    today = datetime.datetime.now(est).date()
+    today = str(datetime.datetime.now(est).date())
+    session = df.loc[today:today] # partial-string slice on the sorted index, no full-frame mask
     def get_range(sh, sm, eh, em):
-        start = pd.Timestamp(f"{today} {sh}:{sm}:00").tz_localize(est)
-        end = pd.Timestamp(f"{today} {eh}:{em}:00").tz_localize(est)
-        chunk = df[(df.index >= start) & (df.index <= end)]
+        chunk = session.between_time(f"{sh}:{sm}", f"{eh}:{em}")
         if chunk.empty: return None
-        dr_h = round(chunk['High'].max(), 2)
-        dr_l = round(chunk['Low'].min(), 2)
+        dr_h = round(float(chunk['High'].values.max()), 2)
+        dr_l = round(float(chunk['Low'].values.min()), 2)
         return {"h": dr_h, "l": dr_l, "mid": round((dr_h+dr_l)/2, 2)}
     return { "RDR": get_range("09", "30", "10", "30") }
 
 def check_silver_bullet(est):
-    now = datetime.datetime.now(est).time()
-    if datetime.time(10, 0) <= now <= datetime.time(11, 0): return "AM SILVER BULLET"
-    if datetime.time(14, 0) <= now <= datetime.time(15, 0): return "PM SILVER BULLET"
+    now = datetime.datetime.now(est)
+    minute = now.hour * 60 + now.minute
+    if 600 <= minute <= 660: return "AM SILVER BULLET"
+    if 840 <= minute <= 900: return "PM SILVER BULLET"
     return "OFF HOURS"
 
+# (is_bull, is_bear) -> (bias, reason)
+M7_BIAS = {
+    (False, False): ("NEUTRAL", None),
+    (True, False): ("BULLISH (KM7)", "Price > RDR High"),
+    (False, True): ("BEARISH (KM7)", "Price < RDR Low"),
+}
+
 # --- ENDPOINTS ---
+def cached_analysis():
+    if _analysis_cache["value"] is not None and time.monotonic() - _analysis_cache["ts"] < ANALYSIS_TTL: return _analysis_cache["value"]
+    return None
+
 @app.get("/analysis")
 async def perform_analysis():
-    est = pytz.timezone('America/New_York')
+    result = cached_analysis()
+    if result is not None: return result
+    async with _analysis_lock:
+        # Another request may have refreshed the cache while we waited
+        result = cached_analysis()
+        if result is None:
+            result = await run_analysis()
+            _analysis_cache.update(ts=time.monotonic(), value=result)
+        return result
+
+async def run_analysis():
     t = yf.Ticker(SYMBOL)
     
-    df_5m = get_candles(t, "5d", "5m", est)
+    df_5m = await asyncio.to_thread(get_candles, t, "5d", "5m", EST)
     if df_5m.empty: 
         return {
             "symbol": SYMBOL, "price": 0, 
@@ -60,22 +96,20 @@ async def perform_analysis():
             "time_logic": {"silver_bullet": "N/A"}
         }
     
-    price = round(df_5m['Close'].iloc[-1], 2)
+    price = round(float(df_5m['Close'].values[-1]), 2)
     
     # Analysis
-    sessions = calculate_m7_sessions(df_5m, est)
-    sb_status = check_silver_bullet(est)
+    sessions = calculate_m7_sessions(df_5m, EST)
+    sb_status = check_silver_bullet(EST)
     
-    m7_bias = "NEUTRAL"
-    if sessions['RDR']:
-        if price > sessions['RDR']['h']: m7_bias = "BULLISH (KM7)"
-        elif price < sessions['RDR']['l']: m7_bias = "BEARISH (KM7)"
+    rdr = sessions['RDR']
+    is_bull = bool(rdr and price > rdr['h'])
+    is_bear = bool(rdr and not is_bull and price < rdr['l'])
+    m7_bias, bias_reason = M7_BIAS[(is_bull, is_bear)]
     
     # Reasoning
-    reasons = []
-    if "BULL" in m7_bias: reasons.append(f"Price > RDR High")
-    if "BEAR" in m7_bias: reasons.append(f"Price < RDR Low")
-    if "BULLET" in sb_status: reasons.append(f"{sb_status} Active")
+    reasons = [bias_reason] if bias_reason else []
+    if sb_status != "OFF HOURS": reasons.append(f"{sb_status} Active")
     
     return {
         "symbol": SYMBOL,
@@ -102,14 +136,20 @@ async def execute_trade(req: TradeReq):
     if not allowed: return {"status": "REJECTED", "reason": reason}
     
     t = yf.Ticker(SYMBOL)
-    df = get_candles(t, "1d", "1m", pytz.timezone('America/New_York'))
+    df = await asyncio.to_thread(get_candles, t, "1d", "1m", EST)
     if df.empty: return {"status": "ERROR", "reason": "Data Offline"}
     
-    price = df['Close'].iloc[-1]
+    price = float(df['Close'].values[-1])
     stop = price - 20 if req.action == "BUY" else price + 20
     
+    # Re-check after the fetch: other trades may have filled while we awaited. No await from here to the order,
+    # so this stats snapshot is still current when the trade is sized.
+    stats = risk.exchange.get_stats()
+    allowed, reason = risk.can_trade(stats)
+    if not allowed: return {"status": "REJECTED", "reason": reason}
+    
     # Execute Paper Trade with Reasoning
-    trade, sizing = risk.execute_paper_trade(SYMBOL, req.action, price, stop, req.reasoning)
+    trade, sizing = risk.execute_paper_trade(SYMBOL, req.action, price, stop, req.reasoning, stats)
     
     return {
         "status": "FILLED (PAPER)",
@@ -1,29 +1,52 @@
-import random
+import os
+import json
+import logging
+import numpy as np
+from collections import deque
 from datetime import datetime
 
+RNG_BATCH = 1024
+log = logging.getLogger(__name__)
+
 class PaperExchange:
-    def __init__(self):
+    def __init__(self, journal_path=None):
         self.balance = 100000.0
         self.pnl = 0.0
-        self.history = [] # In-memory history, but we will persist this to DB
+        self.history = deque(maxlen=10) # Last 10 trades for the dashboard; full audit goes to the journal
+        self.journal_path = journal_path or os.getenv("TRADE_JOURNAL") # Append-only JSONL of every trade, disabled when unset
+        self._wins = 0
+        self._total = 0
+        self._rng = np.random.default_rng()
+        self._refill_rng()
+
+    def _refill_rng(self):
+        # Pre-draw simulation randomness in batches; stored as lists so per-trade reads are plain Python scalars
+        self._slip_buf = self._rng.choice([0, 0.25, 0.5], RNG_BATCH).tolist()
+        self._outcome_buf = (self._rng.random(RNG_BATCH) < 2 / 3).tolist() # True = WIN, same 2:1 odds as before
+        self._rr_buf = self._rng.uniform(1.5, 3.0, RNG_BATCH).tolist()
+        self._rng_idx = 0
 
     def reset(self):
         self.balance = 100000.0
         self.pnl = 0.0
-        self.history = []
+        self.history.clear()
+        self._wins = 0
+        self._total = 0
         return True
 
     def execute_order(self, symbol, action, quantity, price, stop, reasoning):
-        slippage = random.choice([0, 0.25, 0.5])
+        if self._rng_idx >= RNG_BATCH: self._refill_rng()
+        i = self._rng_idx
+        self._rng_idx += 1
+        slippage = self._slip_buf[i]
         fill_price = price + slippage if action == "BUY" else price - slippage
         commission = 2.0 * quantity
         
         # Simulate Outcome
-        outcome = random.choice(["WIN", "LOSS", "WIN"]) 
         profit = 0
         
-        if outcome == "WIN":
-            rr = random.uniform(1.5, 3.0)
+        if self._outcome_buf[i]:
+            rr = self._rr_buf[i]
             risk_amt = abs(fill_price - stop) * quantity * 20 # Roughly NQ calc
             profit = risk_amt * rr
             status = "WIN"
@@ -46,16 +69,22 @@ class PaperExchange:
         }
         
         self.history.append(trade_record)
+        self._total += 1
+        self._wins += status == "WIN"
+        # Journal last and never fatal: account state and risk accounting are already updated.
+        # Note this is a blocking file append on the /execute event loop; one short line per (rare) order.
+        if self.journal_path:
+            try:
+                with open(self.journal_path, "a") as f: f.write(json.dumps(trade_record) + "\n")
+            except OSError as e: log.warning("Trade journal write to %s failed: %s", self.journal_path, e)
         return trade_record
 
     def get_stats(self):
-        wins = len([t for t in self.history if t['result'] == 'WIN'])
-        total = len(self.history)
-        win_rate = round((wins / total * 100), 1) if total > 0 else 0
+        win_rate = round((self._wins / self._total * 100), 1) if self._total > 0 else 0
         return {
             "balance": round(self.balance, 2),
             "pnl": round(self.pnl, 2),
-            "trades_count": total,
+            "trades_count": self._total,
             "win_rate": win_rate,
-            "history": self.history[-10:] # Last 10 trades
+            "history": list(self.history)
         }